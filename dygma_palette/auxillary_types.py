@@ -14,6 +14,20 @@ class AcquisitionSource(NamedTuple):
 FrameGenerator = Generator[MatLike, StopIteration, None]
 
 
+class QuantizationReport(NamedTuple):
+    centroids: MatLike
+    compactness: float
+    sample_size: int
+    attempts: int
+    iterations: int
+    elapsed_ms: float
+    budget_ms: float
+
+    @property
+    def budget_used(self) -> float:
+        return self.elapsed_ms / self.budget_ms
+
+
 class KeyboardUsbPidAndVid(NamedTuple):
     pid: int
     vid: int
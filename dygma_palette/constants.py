@@ -3,7 +3,9 @@ from dygma_palette.auxillary_types import KeyboardInfo, KeyboardUsbIds, Keyboard
 
 CHARSET = "utf-8"
 BAUDRATE = 115200
+SERIAL_TIMEOUT = 2.0  # seconds to wait for a reply line on a kept open port
 PALETTE_SIZE = 16  # 16 colors in the palette
+DAEMON_SOCKET_NAME = "dygma_palette.sock"
 
 
 HARDWARE_IDENTIFIERS = (
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from socket import AF_UNIX, SOCK_STREAM, socket
+from typing import Any, Generator, Iterable
+
+from dygma_palette.auxillary_types import Palette
+from dygma_palette.daemon.protocol import (
+    decode_message, default_socket_path, encode_message, palette_from_json,
+    palette_to_json)
+from dygma_palette.dygma.keyboard import DygmaKeyboard
+from dygma_palette.dygma.utils import detect_dygma_keyboards
+
+
+class DaemonError(RuntimeError):
+    pass
+
+
+class PaletteDaemonClient:
+    def __init__(self, socket_path: Path | None = None) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        self._socket = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            self._socket.connect(str(self.socket_path))
+        except OSError:
+            self._socket.close()
+            raise
+        self._stream = self._socket.makefile("rb")
+
+    def __enter__(self) -> PaletteDaemonClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stream.close()
+        self._socket.close()
+
+    def request(self, command: str, **parameters: Any) -> Any:
+        return self._unwrap(self._exchange({"command": command, **parameters}))
+
+    def batch(self, *requests: dict[str, Any]) -> list[Any]:
+        # each request is executed even if a previous one failed, the first
+        # error is raised once all the replies have been received
+        replies = self.request("batch", requests=list(requests))
+        return [self._unwrap(reply) for reply in replies]
+
+    def list_keyboards(self) -> list[dict[str, Any]]:
+        return self.request("list")
+
+    def get_palettes(self, neuron_identifiers: list[str] | None = None) -> dict[str, Palette]:
+        palettes = self.request("get_palette", keyboards=neuron_identifiers)
+        return {
+            neuron_identifier: palette_from_json(colors)
+            for neuron_identifier, colors in palettes.items()
+        }
+
+    def set_palette(self,
+                    palette: Palette,
+                    neuron_identifiers: list[str] | None = None) -> None:
+        self.request(
+            "set_palette",
+            palette=palette_to_json(palette),
+            keyboards=neuron_identifiers)
+
+    def keyboards(self) -> tuple[RemoteKeyboard, ...]:
+        return tuple(
+            RemoteKeyboard(self, description["neuron_identifier"])
+            for description in self.list_keyboards())
+
+    def _exchange(self, message: dict[str, Any]) -> dict[str, Any]:
+        self._socket.sendall(encode_message(message))
+        line = self._stream.readline()
+        if not line:
+            raise DaemonError(f"connection to {self.socket_path} closed")
+        return decode_message(line)
+
+    @staticmethod
+    def _unwrap(reply: dict[str, Any]) -> Any:
+        if "error" in reply:
+            raise DaemonError(reply["error"])
+        return reply["result"]
+
+
+class RemoteKeyboard:
+    """Stand-in for DygmaKeyboard exposing the palette of a keyboard owned by
+    the daemon."""
+
+    def __init__(self, client: PaletteDaemonClient, neuron_identifier: str) -> None:
+        self.client = client
+        self.neuron_identifier = neuron_identifier
+
+    @property
+    def palette(self) -> Palette:
+        return self.client.get_palettes([self.neuron_identifier])[self.neuron_identifier]
+
+    @palette.setter
+    def palette(self, palette: Palette) -> None:
+        self.client.set_palette(palette, [self.neuron_identifier])
+
+
+@contextmanager
+def connect_keyboards(socket_path: Path | None = None) -> Generator[tuple[DygmaKeyboard | RemoteKeyboard, ...], None, None]:
+    # go through the daemon when it is running, otherwise talk to the serial
+    # ports directly
+    try:
+        client = PaletteDaemonClient(socket_path)
+    except OSError:
+        client = None
+
+    # yield outside of the except clause, or the exceptions raised in the
+    # caller's with block would be chained to the connection error
+    if client is None:
+        yield tuple(
+            DygmaKeyboard(detected_keyboard)
+            for detected_keyboard in detect_dygma_keyboards())
+    else:
+        with client:
+            yield client.keyboards()
+
+
+def set_palette_on_keyboards(dygma_keyboards: Iterable[DygmaKeyboard | RemoteKeyboard],
+                             palette: Palette) -> None:
+    # the keyboards behind the same daemon are set with a single request
+    neuron_identifiers_by_client: dict[PaletteDaemonClient, list[str]] = {}
+    for dygma_keyboard in dygma_keyboards:
+        if isinstance(dygma_keyboard, RemoteKeyboard):
+            neuron_identifiers_by_client.setdefault(
+                dygma_keyboard.client, []).append(dygma_keyboard.neuron_identifier)
+        else:
+            dygma_keyboard.palette = palette
+
+    for client, neuron_identifiers in neuron_identifiers_by_client.items():
+        client.set_palette(palette, neuron_identifiers)
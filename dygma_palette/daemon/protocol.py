@@ -0,0 +1,87 @@
+from json import dumps, loads
+from os import environ, getuid
+from pathlib import Path
+from stat import S_ISDIR
+from tempfile import gettempdir
+from typing import Any, get_type_hints
+
+from dygma_palette.auxillary_types import Palette, RGBW, ValueRange
+from dygma_palette.constants import CHARSET, DAEMON_SOCKET_NAME, PALETTE_SIZE
+
+
+# requests and replies are JSON objects, one per line:
+#   {"command": "list"}
+#   {"command": "get_palette", "keyboards": [neuron_identifier, ...] | null}
+#   {"command": "set_palette", "palette": [[r, g, b, w], ...],
+#    "keyboards": [neuron_identifier, ...] | null}
+#   {"command": "batch", "requests": [request, ...]}
+# replies are either {"result": ...} or {"error": "..."}
+
+
+def default_socket_path() -> Path:
+    runtime_directory = environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return Path(runtime_directory) / DAEMON_SOCKET_NAME
+    return private_directory(
+        Path(gettempdir()) / f"dygma_palette-{getuid()}") / DAEMON_SOCKET_NAME
+
+
+def private_directory(directory: Path) -> Path:
+    # the temporary directory is shared with the other users: anybody could
+    # create the socket, or the directory holding it, before the daemon does
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+
+    status = directory.lstat()
+    if (
+        not S_ISDIR(status.st_mode) or
+        status.st_uid != getuid() or
+        status.st_mode & 0o077
+    ):
+        raise PermissionError(
+            f"{directory} is not a directory reserved to the current user")
+    return directory
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    return f"{dumps(message)}\n".encode(CHARSET)
+
+
+def decode_message(line: bytes) -> dict[str, Any]:
+    message = loads(line.decode(CHARSET))
+    if not isinstance(message, dict):
+        raise ValueError(f"expected a JSON object, got {message!r}")
+    return message
+
+
+def palette_to_json(palette: Palette) -> list[list[int]]:
+    return [list(color) for color in palette]
+
+
+def palette_from_json(colors: list[list[int]]) -> Palette:
+    if not isinstance(colors, list) or len(colors) != PALETTE_SIZE:
+        raise ValueError(f"a palette is a list of {PALETTE_SIZE} colors")
+    return Palette(_color_from_json(color) for color in colors)
+
+
+_COMPONENT_RANGES: dict[str, ValueRange] = {
+    name: hint.__metadata__[0]
+    for name, hint in get_type_hints(RGBW, include_extras=True).items()
+}
+
+
+def _color_from_json(color: list[int]) -> RGBW:
+    if not isinstance(color, list) or not 3 <= len(color) <= len(RGBW._fields):
+        raise ValueError(f"{color=} is not a list of 3 or 4 components")
+    for name, value in zip(RGBW._fields, color):
+        value_range = _COMPONENT_RANGES[name]
+        if (
+            type(value) is not int or
+            not value_range.min <= value <= value_range.max
+        ):
+            raise ValueError(
+                f"{color=}: {name}={value!r} is not an int in "
+                f"[{value_range.min}, {value_range.max}]")
+    return RGBW(*color)
@@ -0,0 +1,235 @@
+#!/bin/env python3
+
+from asyncio import (
+    Future, Lock, StreamReader, StreamWriter, Task, create_task, current_task,
+    gather, get_running_loop, run, start_unix_server, to_thread, wait)
+from contextlib import ExitStack
+from pathlib import Path
+from socket import AF_UNIX, SOCK_STREAM, socket
+from sys import stderr
+from typing import Any, Iterable
+
+from dygma_palette.auxillary_types import Palette
+from dygma_palette.constants import PALETTE_SIZE, SERIAL_TIMEOUT
+from dygma_palette.daemon.protocol import (
+    decode_message, default_socket_path, encode_message, palette_from_json,
+    palette_to_json)
+from dygma_palette.dygma.keyboard import DygmaKeyboard
+from dygma_palette.dygma.utils import detect_dygma_keyboards
+
+
+class KeyboardChannel:
+    """Serialises the access to one open keyboard and caches its state.
+
+    Palette writes are coalesced: while a write is in flight only the most
+    recent requested palette is kept, and every client waiting on a palette
+    that got superseded is released when the newer one has been written.
+    """
+
+    def __init__(self, dygma_keyboard: DygmaKeyboard) -> None:
+        self.dygma_keyboard = dygma_keyboard
+        self.neuron_identifier = dygma_keyboard.neuron_identifier
+        self.name = dygma_keyboard.keyboard.hardware_identifier.name
+        self._lock = Lock()
+        self._palette: Palette | None = None
+        self._pending_palette: Palette | None = None
+        self._pending_waiters: list[Future[None]] = []
+        self._writer: Task[None] | None = None
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "neuron_identifier": self.neuron_identifier,
+            "name": self.name,
+            "device": self.dygma_keyboard.device,
+            "rgbw_mode": self.dygma_keyboard.rgbw_mode,
+        }
+
+    async def get_palette(self) -> Palette:
+        if self._palette is None:
+            async with self._lock:
+                if self._palette is None:
+                    self._palette = await to_thread(
+                        lambda: self.dygma_keyboard.palette)
+        return self._palette
+
+    async def set_palette(self, palette: Palette) -> None:
+        if len(palette) != PALETTE_SIZE:
+            raise ValueError(f"len(palette) != {PALETTE_SIZE}")
+
+        waiter = get_running_loop().create_future()
+        self._pending_palette = palette
+        self._pending_waiters.append(waiter)
+        if self._writer is None or self._writer.done():
+            self._writer = create_task(self._write_pending_palettes())
+        await waiter
+
+    async def _write_pending_palettes(self) -> None:
+        async with self._lock:
+            while self._pending_palette is not None:
+                palette = self._pending_palette
+                waiters = self._pending_waiters
+                self._pending_palette = None
+                self._pending_waiters = []
+                try:
+                    await to_thread(
+                        setattr, self.dygma_keyboard, "palette", palette)
+                except Exception as error:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_exception(error)
+                else:
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+                finally:
+                    # the keyboard may store a converted palette, see
+                    # PaletteDescriptor, so the next read asks it
+                    self._palette = None
+
+
+class PaletteDaemon:
+    def __init__(self, dygma_keyboards: Iterable[DygmaKeyboard]) -> None:
+        self.channels = {
+            (channel := KeyboardChannel(dygma_keyboard)).neuron_identifier: channel
+            for dygma_keyboard in dygma_keyboards
+        }
+        self._clients: dict[Task, StreamWriter] = {}
+
+    async def serve(self, socket_path: Path) -> None:
+        if daemon_is_running(socket_path):
+            raise RuntimeError(f"another daemon is serving on {socket_path}")
+
+        # nobody answers, so the socket file is a leftover of a crashed daemon
+        socket_path.unlink(missing_ok=True)
+        server = await start_unix_server(self._handle_client, path=socket_path)
+        socket_path.chmod(0o600)
+        socket_inode = socket_path.stat().st_ino
+        try:
+            async with server:
+                # not server.serve_forever(): since Python 3.12.1 closing the
+                # server, as it and "async with server" do, waits for every
+                # connection to be closed, so the clients must go first
+                try:
+                    await get_running_loop().create_future()
+                finally:
+                    await self._disconnect_clients()
+        finally:
+            # only remove the socket if it still is ours
+            try:
+                if socket_path.stat().st_ino == socket_inode:
+                    socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    async def _disconnect_clients(self) -> None:
+        # closing the connections ends the handlers waiting for a request, the
+        # ones still serving one after a serial exchange could have timed out
+        # are cancelled
+        clients = tuple(self._clients.items())
+        if not clients:
+            return
+        for _, writer in clients:
+            writer.close()
+        _, stuck_client_tasks = await wait(
+            [client_task for client_task, _ in clients], timeout=SERIAL_TIMEOUT)
+        for client_task in stuck_client_tasks:
+            client_task.cancel()
+        await gather(*stuck_client_tasks, return_exceptions=True)
+
+    async def _handle_client(self,
+                             reader: StreamReader,
+                             writer: StreamWriter) -> None:
+        client_task = current_task()
+        self._clients[client_task] = writer  # pyright: ignore [reportArgumentType]
+        try:
+            while line := await reader.readline():
+                try:
+                    request = decode_message(line)
+                except ValueError as error:
+                    reply = {"error": f"{type(error).__name__}: {error}"}
+                else:
+                    reply = await self._reply(request)
+                writer.write(encode_message(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            self._clients.pop(client_task, None)  # pyright: ignore [reportArgumentType]
+
+    async def _reply(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return {"result": await self.dispatch(request)}
+        except Exception as error:
+            return {"error": f"{type(error).__name__}: {error}"}
+
+    async def dispatch(self, request: dict[str, Any]) -> Any:
+        match request.get("command"):
+            case "list":
+                return [channel.describe() for channel in self.channels.values()]
+            case "get_palette":
+                channels = self._select(request.get("keyboards"))
+                palettes = await gather(
+                    *(channel.get_palette() for channel in channels))
+                return {
+                    channel.neuron_identifier: palette_to_json(palette)
+                    for channel, palette in zip(channels, palettes)
+                }
+            case "set_palette":
+                channels = self._select(request.get("keyboards"))
+                palette = palette_from_json(request["palette"])
+                await gather(
+                    *(channel.set_palette(palette) for channel in channels))
+                return None
+            case "batch":
+                # requests in a batch are executed in order
+                return [
+                    await self._reply(batched_request)
+                    for batched_request in request["requests"]
+                ]
+            case command:
+                raise ValueError(f"unknown {command=}")
+
+    def _select(self, neuron_identifiers: list[str] | None) -> list[KeyboardChannel]:
+        if neuron_identifiers is None:
+            return list(self.channels.values())
+        try:
+            return [self.channels[neuron_identifier]
+                    for neuron_identifier in neuron_identifiers]
+        except KeyError as error:
+            raise KeyError(f"no keyboard with neuron_identifier={error}") from None
+
+
+def daemon_is_running(socket_path: Path) -> bool:
+    with socket(AF_UNIX, SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def main(socket_path: Path | None = None) -> None:
+    socket_path = socket_path or default_socket_path()
+    if daemon_is_running(socket_path):
+        print(f"another daemon is serving on {socket_path}.", file=stderr)
+        exit(3)
+
+    with ExitStack() as stack:
+        dygma_keyboards = tuple(
+            stack.enter_context(DygmaKeyboard(detected_keyboard))
+            for detected_keyboard in detect_dygma_keyboards())
+        if not dygma_keyboards:
+            print("no Dygma keyboards found.", file=stderr)
+            exit(2)
+
+        daemon = PaletteDaemon(dygma_keyboards)
+        print(f"serving {len(daemon.channels)} keyboard(s) on {socket_path}")
+        try:
+            run(daemon.serve(socket_path))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
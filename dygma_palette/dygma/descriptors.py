@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 
 from dygma_palette.auxillary_types import Palette, RGBW, VersionType 
 from dygma_palette.constants import PALETTE_SIZE
-from dygma_palette.dygma.utils import neuron_io, rgb2rgbw
+from dygma_palette.dygma.utils import neuron_exchange, neuron_io, rgb2rgbw
 
 
 if TYPE_CHECKING:
@@ -21,8 +21,16 @@ class DygmaRaiseBaseDescriptor(metaclass=ABCMeta):
     def __set_name__(self, owner: DygmaKeyboard, name: str) -> None:
         self.name = name
 
-    def _neuron_io(self, device: str, request: str) -> tuple[str, ...]:
-        return tuple(neuron_io(device, request))
+    def _neuron_io(self, dygma_keyboard: DygmaKeyboard, request: str) -> tuple[str, ...]:
+        connection = dygma_keyboard.serial_connection()
+        if connection is None:
+            return tuple(neuron_io(dygma_keyboard.device, request))
+        try:
+            return tuple(neuron_exchange(connection, request))
+        except OSError:
+            # SerialException and TimeoutError included
+            dygma_keyboard.reset()
+            raise
 
     @property
     @abstractmethod
@@ -37,7 +45,7 @@ class NeuronIdentifierDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> str:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return reply[0]
 
 
@@ -48,7 +56,7 @@ class FirmwareVersionDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> VersionType:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return VersionType._make(
             int(value) if index != 3 else value
             for index, value in enumerate(version_parser(reply[0]).groups())) # pyright: ignore [reportOptionalMemberAccess]
@@ -61,7 +69,7 @@ class HardwareIdentifierDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> str:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return reply[0]
 
 
@@ -72,7 +80,7 @@ class HardwareVersionDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> str:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return reply[0]
 
 
@@ -83,7 +91,7 @@ class KeyboardLayoutDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> str:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return reply[0]
 
 
@@ -94,7 +102,7 @@ class PaletteDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> Palette:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         color_components = iter(int(x) for x in reply[0].split(" "))
         return Palette( 
             RGBW._make(
@@ -117,7 +125,7 @@ class PaletteDescriptor(DygmaRaiseBaseDescriptor):
                 color[:dygma_keyboard.color_components_size]
                 for color in palette))
         request = f"palette {color_components}"
-        self._neuron_io(dygma_keyboard.device, request)
+        self._neuron_io(dygma_keyboard, request)
 
         
 class SettingsVersionDescriptor(DygmaRaiseBaseDescriptor):
@@ -127,6 +135,6 @@ class SettingsVersionDescriptor(DygmaRaiseBaseDescriptor):
 
     def __get__(self, dygma_keyboard: DygmaKeyboard, objtype=None) -> int:
         request = self.command
-        reply = self._neuron_io(dygma_keyboard.device, request)
+        reply = self._neuron_io(dygma_keyboard, request)
         return int(reply[0])
 
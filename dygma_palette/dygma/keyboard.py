@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
+from serial import Serial
 from serial.tools.list_ports import comports as list_serial_ports
 
+from dygma_palette.constants import BAUDRATE, SERIAL_TIMEOUT
 from dygma_palette.dygma.descriptors import (
     FirmwareVersionDescriptor, HardwareIdentifierDescriptor,
     HardwareVersionDescriptor, KeyboardLayoutDescriptor,
@@ -15,6 +17,41 @@ if TYPE_CHECKING:
 class DygmaKeyboard:
     def __init__(self, keyboard: DetectedKeyboard):
         self.keyboard = keyboard
+        self.connection: Serial | None = None
+        self.keep_open = False
+
+    def __enter__(self) -> DygmaKeyboard:
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        # keep the serial port open across commands instead of reopening it
+        # for each request, see neuron_io
+        self.keep_open = True
+        self.serial_connection()
+
+    def close(self) -> None:
+        self.keep_open = False
+        self.reset()
+
+    def reset(self) -> None:
+        # drop a connection left in an unknown state by a failed command, it
+        # is reopened by the next one
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def serial_connection(self) -> Serial | None:
+        if self.keep_open and self.connection is None:
+            self.connection = Serial(
+                port=self.device,
+                baudrate=BAUDRATE,
+                timeout=SERIAL_TIMEOUT,
+                exclusive=True)
+        return self.connection
 
     @property
     def device(self) -> str:
@@ -11,6 +11,7 @@ from dygma_palette.constants import CHARSET, HARDWARE_IDENTIFIERS, BAUDRATE
 
 
 if TYPE_CHECKING:
+    from dygma_palette.daemon.client import RemoteKeyboard
     from dygma_palette.dygma.keyboard import DygmaKeyboard
 
 
@@ -42,17 +43,28 @@ def detect_dygma_keyboards() -> Generator[DetectedKeyboard, None, None]:
                 yield keyboard_params
 
 
+def neuron_exchange(connection: Serial, request: str) -> Generator[str, None, None]:
+    # drop whatever is left from a previous exchange that was interrupted
+    connection.reset_input_buffer()
+    connection.write(f"{request}\n".encode(CHARSET))
+    while True:
+        line = connection.readline()
+        if not line.endswith(b"\n"):
+            # readline only returns an unterminated line on timeout
+            raise TimeoutError(f"no reply from {connection.port} to {request!r}")
+        received = line.strip().decode(CHARSET)
+        if received == ".":
+            break
+        yield received
+
+
 def neuron_io(device: str, request: str) -> Generator[str, None, None]:
     with Serial(port=device, baudrate=BAUDRATE) as connection:
-        connection.write(f"{request}\n".encode(CHARSET))
-        while "." != (received := connection.readline()
-                                            .strip()
-                                            .decode(CHARSET)):
-            yield received
+        yield from neuron_exchange(connection, request)
 
 
 @contextmanager
-def palette_backup_restore(dygma_keyboards: tuple[DygmaKeyboard, ...]) -> Generator[None, None, None]:
+def palette_backup_restore(dygma_keyboards: tuple[DygmaKeyboard | RemoteKeyboard, ...]) -> Generator[None, None, None]:
     original_palette = {
         dygma_keyboard.neuron_identifier: dygma_keyboard.palette
         for dygma_keyboard in dygma_keyboards
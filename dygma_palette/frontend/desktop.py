@@ -1,4 +1,6 @@
-from typing import Callable
+from __future__ import annotations
+
+from typing import Callable, TYPE_CHECKING
 
 import cv2
 import numpy as np
@@ -7,12 +9,17 @@ from cv2.typing import MatLike
 
 from dygma_palette.auxillary_types import FrameGenerator, Palette
 from dygma_palette.constants import PALETTE_SIZE
-from dygma_palette.dygma.keyboard import DygmaKeyboard
+from dygma_palette.daemon.client import set_palette_on_keyboards
 from dygma_palette.image import (
-    calculate_color_for_label, calculate_perceived_brightness,
+    AdaptiveQuantizer, calculate_color_for_label, calculate_perceived_brightness,
     centroids_to_palette, extract_centroids)
 
 
+if TYPE_CHECKING:
+    from dygma_palette.daemon.client import RemoteKeyboard
+    from dygma_palette.dygma.keyboard import DygmaKeyboard
+
+
 def wait_for_key(timeout: int) -> int:
     return cv2.waitKey(timeout)
 
@@ -69,26 +76,42 @@ def process_centroids(centroids: MatLike,
     # opencv color components order is BGR not RGB
     return centroids_to_palette(centroids)
 
-def run(dygma_keyboards: tuple[DygmaKeyboard, ...],
-        image_generator: FrameGenerator) -> None:
+def run(dygma_keyboards: tuple[DygmaKeyboard | RemoteKeyboard, ...],
+        image_generator: FrameGenerator,
+        latency_budget_ms: float | None = None) -> None:
+    quantizer = None
+    if latency_budget_ms is not None:
+        quantizer = AdaptiveQuantizer(
+            budget_ms=latency_budget_ms,
+            palette_size=PALETTE_SIZE)
+
     try:
         for image_number, image in enumerate(image_generator):
-            image_window_name = f"Image {image_number}"
-            palette_window_name = f"Palette {image_number}"
-            centroids = extract_centroids(
-                image=image,
-                palette_size=PALETTE_SIZE)
+            if quantizer is None:
+                # a new pair of windows for each frame, closed on key press
+                image_window_name = f"Image {image_number}"
+                palette_window_name = f"Palette {image_number}"
+                centroids = extract_centroids(
+                    image=image,
+                    palette_size=PALETTE_SIZE)
+            else:
+                # streaming: the same windows are updated by every frame
+                image_window_name = "Image"
+                palette_window_name = "Palette"
+                centroids = quantizer(image).centroids
             show_image(image, window_name=image_window_name)
             show_centroids(centroids, window_name=palette_window_name)
 
             palette = process_centroids(centroids)
             print(f"new {palette=}")
-            for dygma_keyboard in dygma_keyboards:
-                dygma_keyboard.palette = palette
-
-            key = wait_for_key(timeout=0)
-            close_window(image_window_name)
-            close_window(palette_window_name)
+            set_palette_on_keyboards(dygma_keyboards, palette)
+
+            if quantizer is None:
+                key = wait_for_key(timeout=0)
+                close_window(image_window_name)
+                close_window(palette_window_name)
+            else:
+                key = wait_for_key(timeout=1)
             if (key & 0xFF) == ord("q"):
                 break
     except KeyboardInterrupt:
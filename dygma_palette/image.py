@@ -1,6 +1,9 @@
+from collections import deque
 from contextlib import contextmanager
 from itertools import count
 from math import sqrt
+from statistics import median
+from time import perf_counter
 from typing import Generator
 
 import cv2
@@ -9,7 +12,8 @@ from cv2.typing import MatLike
 
 
 from dygma_palette.auxillary_types import (
-    AcquisitionSource, FrameGenerator, Palette, Palette, RGBW)
+    AcquisitionSource, FrameGenerator, Palette, Palette, QuantizationReport,
+    RGBW)
 
 
 def list_acquisition_sources() -> Generator[AcquisitionSource, None, None]:
@@ -92,6 +96,130 @@ def extract_centroids(image: MatLike, palette_size: int) -> MatLike:
     return centroids
 
 
+class AdaptiveQuantizer:
+    """k-means palette extraction that tries to stay within a per-frame
+    latency budget.
+
+    The cost of a single k-means attempt is modelled as proportional to
+    sample_size * iterations; the milliseconds per unit are tracked over the
+    last history_size frames and used to plan how many pixels to sample and how many
+    iterations to allow.  When the budget is tight the sample size is reduced
+    first, then the number of attempts, then the iterations.  Attempts are run
+    one at a time until the next one would not fit in the budget and the
+    centroids with the best compactness are returned.
+    """
+
+    def __init__(self,
+                 budget_ms: float,
+                 palette_size: int,
+                 max_attempts: int = 10,
+                 max_iterations: int = 10,
+                 min_iterations: int = 3,
+                 min_sample_size: int = 1024,
+                 history_size: int = 16) -> None:
+        if budget_ms <= 0:
+            raise ValueError("budget_ms must be positive")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be positive")
+        if max_iterations < 1:
+            raise ValueError("max_iterations must be positive")
+
+        self.budget_ms = budget_ms
+        self.palette_size = palette_size
+        self.max_attempts = max_attempts
+        self.max_iterations = max_iterations
+        self.min_iterations = min(min_iterations, max_iterations)
+        self.min_sample_size = max(min_sample_size, palette_size)
+        self._unit_costs: deque[float] = deque(maxlen=history_size)
+        self._random = np.random.default_rng()
+
+    @property
+    def unit_cost_ms(self) -> float | None:
+        # milliseconds needed to run one iteration over one sampled pixel,
+        # median of the per frame averages
+        if not self._unit_costs:
+            return None
+        return median(self._unit_costs)
+
+    def _plan(self, pixel_count: int) -> tuple[int, int, int]:
+        min_sample_size = min(self.min_sample_size, pixel_count)
+
+        unit_cost_ms = self.unit_cost_ms
+        if unit_cost_ms is None:
+            # no timings yet: a cheap first frame calibrates the cost model
+            return min_sample_size, 1, self.min_iterations
+
+        units = self.budget_ms / unit_cost_ms
+
+        sample_size = int(units / (self.max_attempts * self.max_iterations))
+        if sample_size >= min_sample_size:
+            return (min(sample_size, pixel_count),
+                    self.max_attempts,
+                    self.max_iterations)
+
+        attempts = int(units / (min_sample_size * self.max_iterations))
+        if attempts >= 1:
+            return min_sample_size, attempts, self.max_iterations
+
+        iterations = int(units / min_sample_size)
+        return (min_sample_size,
+                1,
+                max(self.min_iterations, min(iterations, self.max_iterations)))
+
+    def __call__(self, image: MatLike) -> QuantizationReport:
+        start = perf_counter()
+
+        height, width, color_depth = image.shape
+        pixel_count = height * width
+        sample_size, planned_attempts, iterations = self._plan(pixel_count)
+
+        data = np.reshape(image, (pixel_count, color_depth))
+        if sample_size < pixel_count:
+            data = data[self._random.integers(0, pixel_count, sample_size)]
+        data = np.float32(data)
+
+        termination_criteria = \
+            (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, iterations, 1.0)
+        flags = cv2.KMEANS_RANDOM_CENTERS
+
+        best_compactness = float("inf")
+        best_centroids = None
+        attempts = 0
+        attempt_ms = 0.0
+        while attempts < planned_attempts:
+            elapsed_ms = (perf_counter() - start) * 1000
+            if attempts and elapsed_ms + attempt_ms > self.budget_ms:
+                break
+
+            attempt_start = perf_counter()
+            compactness, _, centroids = cv2.kmeans(
+                data=data,  # pyright: ignore [reportArgumentType, reportCallIssue]
+                K=self.palette_size,
+                bestLabels=None,  # pyright: ignore [reportArgumentType, reportCallIssue]
+                criteria=termination_criteria,
+                attempts=1,
+                flags=flags)  # pyright: ignore [reportArgumentType, reportCallIssue]
+            last_attempt_ms = (perf_counter() - attempt_start) * 1000
+
+            attempts += 1
+            attempt_ms += (last_attempt_ms - attempt_ms) / attempts
+
+            if compactness < best_compactness:
+                best_compactness = compactness
+                best_centroids = centroids
+
+        self._unit_costs.append(attempt_ms / (sample_size * iterations))
+
+        return QuantizationReport(
+            centroids=best_centroids,  # pyright: ignore [reportArgumentType]
+            compactness=best_compactness,
+            sample_size=sample_size,
+            attempts=attempts,
+            iterations=iterations,
+            elapsed_ms=(perf_counter() - start) * 1000,
+            budget_ms=self.budget_ms)
+
+
 def calculate_perceived_brightness(bgr_centroid: MatLike) -> int:
     # http://alienryderflex.com/hsp.html
     return round(
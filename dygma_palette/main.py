@@ -1,14 +1,26 @@
 #!/bin/env python3
 
+from argparse import ArgumentParser
 from sys import stderr
 
-from dygma_palette.dygma.keyboard import DygmaKeyboard
-from dygma_palette.dygma.utils import detect_dygma_keyboards, palette_backup_restore
+from dygma_palette.daemon.client import connect_keyboards
+from dygma_palette.dygma.utils import palette_backup_restore
 from dygma_palette.image import acquire_image, list_acquisition_sources
 from dygma_palette.frontend.desktop import run
 
 
 def main() -> None:
+    parser = ArgumentParser(description=(
+        "set the palette of the Dygma keyboards to the main colors captured "
+        "by the first webcam"))
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=None,
+        help="time budget per frame for the color quantization, adapting "
+             "its quality to stay within it")
+    arguments = parser.parse_args()
+
     acquisition_devices = filter(
         lambda acquisition_source: acquisition_source.is_reading,
         list_acquisition_sources())
@@ -18,16 +30,16 @@ def main() -> None:
         print("no acquisition devices found.", file=stderr)
         exit(1)
 
-    dygma_keyboards = tuple(
-        DygmaKeyboard(detected_keyboard)
-        for detected_keyboard in detect_dygma_keyboards())
-    if not dygma_keyboards:
-        print("no Dygma keyboards found.", file=stderr)
-        exit(2)
+    with connect_keyboards() as dygma_keyboards:
+        if not dygma_keyboards:
+            print("no Dygma keyboards found.", file=stderr)
+            exit(2)
 
-    with palette_backup_restore(dygma_keyboards):
-        with acquire_image(acquisition_device) as image_generator:
-            run(dygma_keyboards, image_generator)
+        with palette_backup_restore(dygma_keyboards):
+            with acquire_image(acquisition_device) as image_generator:
+                run(dygma_keyboards,
+                    image_generator,
+                    latency_budget_ms=arguments.latency_budget_ms)
 
 
 if __name__ == "__main__":
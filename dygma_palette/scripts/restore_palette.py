@@ -4,8 +4,7 @@ from ast import literal_eval
 from sys import stderr
 
 from dygma_palette.auxillary_types import Palette, RGBW
-from dygma_palette.dygma.keyboard import DygmaKeyboard
-from dygma_palette.dygma.utils import detect_dygma_keyboards
+from dygma_palette.daemon.client import connect_keyboards
 
 
 def restore_palette_using_stdout_backup() -> None:
@@ -20,21 +19,22 @@ def restore_palette_using_stdout_backup() -> None:
                                  .replace("w=", "")
     backup = literal_eval(simplified_text)
 
-    detected_keyboards = {
-        (keyboard := DygmaKeyboard(configuration)).neuron_identifier: keyboard
-        for configuration in detect_dygma_keyboards() 
-    } 
-
-    for neuron_identifier, palette in backup.items():
-        try:
-            keyboard = detected_keyboards[neuron_identifier]
-        except KeyError:
-            print(
-                f"Keyboard with {neuron_identifier=} not found, skipping!",
-                file=stderr)
-        else:
-            keyboard.palette = Palette(RGBW._make(color) for color in palette)
-            print(f"Restored palette in keyboard with {neuron_identifier=}.")
+    with connect_keyboards() as keyboards:
+        detected_keyboards = {
+            keyboard.neuron_identifier: keyboard
+            for keyboard in keyboards
+        }
+
+        for neuron_identifier, palette in backup.items():
+            try:
+                keyboard = detected_keyboards[neuron_identifier]
+            except KeyError:
+                print(
+                    f"Keyboard with {neuron_identifier=} not found, skipping!",
+                    file=stderr)
+            else:
+                keyboard.palette = Palette(RGBW._make(color) for color in palette)
+                print(f"Restored palette in keyboard with {neuron_identifier=}.")
 
 
 if __name__ == "__main__":
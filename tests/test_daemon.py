@@ -0,0 +1,295 @@
+from asyncio import (
+    all_tasks, create_task, current_task, gather, new_event_loop,
+    open_unix_connection, run, run_coroutine_threadsafe, sleep as async_sleep,
+    wait)
+import tempfile
+from pathlib import Path
+from socket import AF_UNIX, SOCK_STREAM, socket
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import monotonic, sleep
+from types import SimpleNamespace
+
+import pytest
+
+from dygma_palette.auxillary_types import RGBW
+from dygma_palette.constants import DAEMON_SOCKET_NAME, PALETTE_SIZE
+from dygma_palette.daemon import client as daemon_client
+from dygma_palette.daemon.client import (
+    DaemonError, PaletteDaemonClient, RemoteKeyboard, connect_keyboards,
+    set_palette_on_keyboards)
+from dygma_palette.daemon import server as daemon_server
+from dygma_palette.daemon.protocol import (
+    decode_message, default_socket_path, encode_message, palette_to_json,
+    private_directory)
+from dygma_palette.daemon.server import PaletteDaemon
+
+
+class FakeKeyboard:
+    device = "/dev/fake"
+    rgbw_mode = False
+
+    def __init__(self, neuron_identifier: str) -> None:
+        self.neuron_identifier = neuron_identifier
+        self.keyboard = SimpleNamespace(
+            hardware_identifier=SimpleNamespace(name="Fake keyboard"))
+        # writes block until write_allowed is set
+        self.write_started = Event()
+        self.write_allowed = Event()
+        self.write_allowed.set()
+        self.writes = []
+        self._palette = tuple(RGBW(1, 2, 3) for _ in range(PALETTE_SIZE))
+
+    @property
+    def palette(self):
+        return self._palette
+
+    @palette.setter
+    def palette(self, palette) -> None:
+        self.write_started.set()
+        assert self.write_allowed.wait(timeout=5)
+        self.writes.append(palette)
+        self._palette = palette
+
+
+def uniform_palette(value: int) -> tuple[RGBW, ...]:
+    return tuple(RGBW(value, value, value) for _ in range(PALETTE_SIZE))
+
+
+def wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = monotonic() + timeout
+    while not condition():
+        assert monotonic() < deadline, "timed out"
+        sleep(0.001)
+
+
+@pytest.fixture
+def socket_path():
+    # pytest's tmp_path can exceed the length allowed for unix socket paths
+    with TemporaryDirectory(prefix="dygma") as directory:
+        yield Path(directory) / "daemon.sock"
+
+
+async def cancel_all_tasks() -> None:
+    tasks = all_tasks() - {current_task()}
+    for task in tasks:
+        task.cancel()
+    await gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture
+def serve(socket_path):
+    loop = new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    # the event loop only keeps weak references to its tasks
+    serving = []
+
+    def start(*keyboards: FakeKeyboard) -> PaletteDaemon:
+        daemon = PaletteDaemon(keyboards)  # pyright: ignore [reportArgumentType]
+        serving.append(run_coroutine_threadsafe(daemon.serve(socket_path), loop))
+        while not socket_path.exists():
+            sleep(0.01)
+        return daemon
+
+    yield start
+
+    run_coroutine_threadsafe(cancel_all_tasks(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def raw_exchange(socket_path: Path, payload: bytes) -> dict:
+    with socket(AF_UNIX, SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        connection.sendall(payload)
+        return decode_message(connection.makefile("rb").readline())
+
+
+def test_list_and_get_palette(serve, socket_path) -> None:
+    serve(FakeKeyboard("a"), FakeKeyboard("b"))
+    with PaletteDaemonClient(socket_path) as client:
+        assert [keyboard["neuron_identifier"]
+                for keyboard in client.list_keyboards()] == ["a", "b"]
+        assert client.get_palettes(["b"]) == {
+            "b": tuple(RGBW(1, 2, 3) for _ in range(PALETTE_SIZE))}
+
+
+def test_concurrent_set_palette_requests_are_coalesced(serve, socket_path) -> None:
+    keyboard = FakeKeyboard("a")
+    keyboard.write_allowed.clear()
+    channel = serve(keyboard).channels["a"]
+
+    def set_palette(value: int) -> None:
+        with PaletteDaemonClient(socket_path) as client:
+            client.set_palette(uniform_palette(value))
+
+    threads = [Thread(target=set_palette, args=(value,)) for value in range(8)]
+    threads[0].start()
+    assert keyboard.write_started.wait(timeout=5)
+    # the other requests queue up while the first write is blocked
+    for queued, thread in enumerate(threads[1:], start=1):
+        thread.start()
+        wait_until(lambda: len(channel._pending_waiters) == queued)
+    keyboard.write_allowed.set()
+    for thread in threads:
+        thread.join()
+
+    assert keyboard.writes == [uniform_palette(0), uniform_palette(7)]
+    with PaletteDaemonClient(socket_path) as client:
+        assert client.get_palettes()["a"] == uniform_palette(7)
+
+
+def test_set_palette_on_keyboards_sends_one_request(serve, socket_path) -> None:
+    keyboards = FakeKeyboard("a"), FakeKeyboard("b")
+    serve(*keyboards)
+    with PaletteDaemonClient(socket_path) as client:
+        requests = []
+        request = client.request
+        client.request = lambda *args, **kwargs: (
+            requests.append(args), request(*args, **kwargs))[1]
+        set_palette_on_keyboards(client.keyboards(), uniform_palette(9))
+
+    assert requests == [("list",), ("set_palette",)]
+    assert all(keyboard.writes == [uniform_palette(9)] for keyboard in keyboards)
+
+
+def test_batch_runs_requests_in_order(serve, socket_path) -> None:
+    serve(FakeKeyboard("a"))
+    with PaletteDaemonClient(socket_path) as client:
+        _, palettes = client.batch(
+            {"command": "set_palette", "palette": [[4, 5, 6]] * PALETTE_SIZE},
+            {"command": "get_palette"})
+    assert palettes == {"a": [[4, 5, 6, 0]] * PALETTE_SIZE}
+
+
+@pytest.mark.parametrize("request_parameters", [
+    {"command": "unknown"},
+    {"command": "get_palette", "keyboards": ["missing"]},
+    {"command": "set_palette", "palette": [[300, -5, 0, 0]] * PALETTE_SIZE},
+    {"command": "set_palette", "palette": [[1, 2, 3]] * (PALETTE_SIZE - 1)},
+    {"command": "set_palette", "palette": [[1.5, 2, 3]] * PALETTE_SIZE},
+])
+def test_invalid_requests_get_an_error_reply(serve, socket_path, request_parameters) -> None:
+    keyboard = FakeKeyboard("a")
+    serve(keyboard)
+    with PaletteDaemonClient(socket_path) as client:
+        with pytest.raises(DaemonError):
+            client.request(**request_parameters)
+    assert keyboard.writes == []
+
+
+def test_malformed_json_gets_an_error_reply(serve, socket_path) -> None:
+    serve(FakeKeyboard("a"))
+    assert "error" in raw_exchange(socket_path, b"{not json\n")
+    assert "error" in raw_exchange(socket_path, b"[1, 2]\n")
+
+
+def test_second_daemon_refuses_to_take_over_the_socket(serve, socket_path) -> None:
+    serve(FakeKeyboard("a"))
+    with pytest.raises(RuntimeError):
+        run(PaletteDaemon([]).serve(socket_path))
+    with PaletteDaemonClient(socket_path) as client:
+        assert client.list_keyboards()
+
+
+def test_connect_keyboards_uses_the_daemon(serve, socket_path) -> None:
+    serve(FakeKeyboard("a"))
+    with connect_keyboards(socket_path) as keyboards:
+        assert len(keyboards) == 1
+        assert isinstance(keyboards[0], RemoteKeyboard)
+        assert keyboards[0].palette == tuple(RGBW(1, 2, 3) for _ in range(PALETTE_SIZE))
+
+
+def test_connect_keyboards_fallback_does_not_chain_errors(socket_path, monkeypatch) -> None:
+    monkeypatch.setattr(daemon_client, "detect_dygma_keyboards", lambda: iter(()))
+    with pytest.raises(KeyError) as error:
+        with connect_keyboards(socket_path) as keyboards:
+            assert keyboards == ()
+            raise KeyError("raised by the caller")
+    assert error.value.__context__ is None
+
+
+def test_serve_stops_while_a_client_is_connected(socket_path) -> None:
+    async def serve_then_stop() -> None:
+        serving = create_task(PaletteDaemon([]).serve(socket_path))
+        while not socket_path.exists():
+            await async_sleep(0.01)
+        _, writer = await open_unix_connection(socket_path)
+        await async_sleep(0.01)
+
+        serving.cancel()
+        done, _ = await wait({serving}, timeout=1)
+        # let a stuck server go before failing, or run() would hang
+        writer.transport.abort()
+        await wait({serving}, timeout=1)
+        assert serving in done
+        assert serving.cancelled()
+
+    run(serve_then_stop())
+    assert not socket_path.exists()
+
+
+def test_default_socket_path_uses_the_runtime_directory(monkeypatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert default_socket_path() == Path("/run/user/1000") / DAEMON_SOCKET_NAME
+
+
+def test_default_socket_path_falls_back_to_a_private_directory(monkeypatch) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    with TemporaryDirectory() as directory:
+        monkeypatch.setattr(tempfile, "tempdir", directory)
+        socket_path = default_socket_path()
+        assert socket_path.parent.parent == Path(directory)
+        assert socket_path.parent.stat().st_mode & 0o777 == 0o700
+        assert default_socket_path() == socket_path
+
+
+def world_writable_directory(directory: Path) -> None:
+    directory.mkdir()
+    directory.chmod(0o777)
+
+
+def symlink_to_a_private_directory(directory: Path) -> None:
+    target = directory.with_name("target")
+    target.mkdir(mode=0o700)
+    directory.symlink_to(target)
+
+
+@pytest.mark.parametrize("prepare", [
+    world_writable_directory, symlink_to_a_private_directory, Path.touch])
+def test_private_directory_rejects_what_others_could_control(prepare) -> None:
+    with TemporaryDirectory() as parent:
+        directory = Path(parent) / "private"
+        prepare(directory)
+        with pytest.raises(PermissionError):
+            private_directory(directory)
+
+
+def test_serve_stops_while_a_request_is_stuck_on_the_keyboard(socket_path, monkeypatch) -> None:
+    monkeypatch.setattr(daemon_server, "SERIAL_TIMEOUT", 0.1)
+    keyboard = FakeKeyboard("a")
+    keyboard.write_allowed.clear()
+
+    async def serve_then_stop() -> None:
+        serving = create_task(PaletteDaemon([keyboard]).serve(socket_path))  # pyright: ignore [reportArgumentType]
+        while not socket_path.exists():
+            await async_sleep(0.01)
+        reader, writer = await open_unix_connection(socket_path)
+        writer.write(encode_message({
+            "command": "set_palette",
+            "palette": palette_to_json(uniform_palette(1))}))
+        while not keyboard.write_started.is_set():
+            await async_sleep(0.01)
+
+        serving.cancel()
+        done, _ = await wait({serving}, timeout=1)
+        keyboard.write_allowed.set()
+        writer.transport.abort()
+        await wait({serving}, timeout=1)
+        assert serving in done
+        assert await reader.read() == b""
+
+    run(serve_then_stop())
+    assert not socket_path.exists()
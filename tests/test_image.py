@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from dygma_palette import image as image_module
+from dygma_palette.constants import PALETTE_SIZE
+from dygma_palette.image import AdaptiveQuantizer
+
+
+BUDGET_MS = 100.0
+PIXEL_COUNT = 10_000
+
+
+def quantizer_with_units(units: float) -> AdaptiveQuantizer:
+    # units is the number of sample * iteration steps that fit in the budget
+    quantizer = AdaptiveQuantizer(budget_ms=BUDGET_MS, palette_size=PALETTE_SIZE)
+    quantizer._unit_costs.append(BUDGET_MS / units)
+    return quantizer
+
+
+def test_plan_without_timings_is_cheap() -> None:
+    quantizer = AdaptiveQuantizer(budget_ms=BUDGET_MS, palette_size=PALETTE_SIZE)
+    assert quantizer._plan(PIXEL_COUNT) == (1024, 1, 3)
+
+
+def test_plan_uses_everything_when_budget_allows() -> None:
+    quantizer = quantizer_with_units(1e12)
+    assert quantizer._plan(PIXEL_COUNT) == (PIXEL_COUNT, 10, 10)
+
+
+def test_plan_reduces_sample_size_first() -> None:
+    quantizer = quantizer_with_units(5000.5 * 10 * 10)
+    assert quantizer._plan(PIXEL_COUNT) == (5000, 10, 10)
+
+
+def test_plan_reduces_attempts_second() -> None:
+    quantizer = quantizer_with_units(1024 * 10 * 4.5)
+    assert quantizer._plan(PIXEL_COUNT) == (1024, 4, 10)
+
+
+def test_plan_reduces_iterations_last() -> None:
+    quantizer = quantizer_with_units(1024 * 5.5)
+    assert quantizer._plan(PIXEL_COUNT) == (1024, 1, 5)
+
+
+def test_plan_never_goes_below_min_iterations() -> None:
+    quantizer = quantizer_with_units(1.0)
+    assert quantizer._plan(PIXEL_COUNT) == (1024, 1, 3)
+
+
+@pytest.mark.parametrize("parameters", [
+    {"budget_ms": 0},
+    {"budget_ms": BUDGET_MS, "max_attempts": 0},
+    {"budget_ms": BUDGET_MS, "max_iterations": 0},
+])
+def test_invalid_parameters_are_rejected(parameters) -> None:
+    with pytest.raises(ValueError):
+        AdaptiveQuantizer(palette_size=PALETTE_SIZE, **parameters)
+
+
+def test_call_returns_centroids_and_records_one_cost_per_frame() -> None:
+    image = np.random.default_rng(0).integers(
+        0, 256, size=(40, 50, 3), dtype=np.uint8)
+    quantizer = AdaptiveQuantizer(budget_ms=1000.0, palette_size=PALETTE_SIZE)
+
+    for frame in range(1, 4):
+        report = quantizer(image)
+        assert report.centroids.shape == (PALETTE_SIZE, 3)
+        assert report.attempts >= 1
+        assert report.budget_ms == 1000.0
+        assert len(quantizer._unit_costs) == frame
+
+
+class FakeClock:
+    """Stands in for perf_counter, k-means advances it by unit_cost_ms for
+    each sampled pixel and iteration."""
+
+    def __init__(self, unit_cost_ms: float) -> None:
+        self.unit_cost_ms = unit_cost_ms
+        self.seconds = 0.0
+
+    def __call__(self) -> float:
+        return self.seconds
+
+    def kmeans(self, data, K, bestLabels, criteria, attempts, flags):
+        _, iterations, _ = criteria
+        self.seconds += len(data) * iterations * self.unit_cost_ms / 1000
+        return float(self.seconds), None, np.zeros((K, 3), np.float32)
+
+
+@pytest.fixture
+def image():
+    return np.random.default_rng(0).integers(
+        0, 256, size=(200, 200, 3), dtype=np.uint8)
+
+
+def install_clock(monkeypatch, unit_cost_ms: float) -> FakeClock:
+    clock = FakeClock(unit_cost_ms)
+    monkeypatch.setattr(image_module, "perf_counter", clock)
+    monkeypatch.setattr(image_module.cv2, "kmeans", clock.kmeans)
+    return clock
+
+
+def test_fast_machine_grows_the_plan_after_the_first_frame(monkeypatch, image) -> None:
+    install_clock(monkeypatch, unit_cost_ms=1e-4)
+    quantizer = AdaptiveQuantizer(budget_ms=BUDGET_MS, palette_size=PALETTE_SIZE)
+
+    cold = quantizer(image)
+    assert (cold.sample_size, cold.attempts, cold.iterations) == (1024, 1, 3)
+    assert cold.elapsed_ms == pytest.approx(1024 * 3 * 1e-4)
+    assert cold.budget_used == pytest.approx(cold.elapsed_ms / BUDGET_MS)
+
+    warm = quantizer(image)
+    assert warm.sample_size == pytest.approx(10_000, abs=1)
+    assert warm.iterations == 10
+    assert warm.attempts in (9, 10)
+    assert warm.budget_used == pytest.approx(1.0, abs=0.11)
+    assert warm.budget_used <= 1.0 + 1e-9
+
+
+def test_slow_machine_reduces_iterations_after_the_first_frame(monkeypatch, image) -> None:
+    install_clock(monkeypatch, unit_cost_ms=1e-2)
+    quantizer = AdaptiveQuantizer(budget_ms=BUDGET_MS, palette_size=PALETTE_SIZE)
+
+    quantizer(image)
+    warm = quantizer(image)
+    assert (warm.sample_size, warm.attempts, warm.iterations) == (1024, 1, 9)
+    assert warm.elapsed_ms == pytest.approx(1024 * 9 * 1e-2)
+    assert warm.budget_used == pytest.approx(0.9216)
+
+
+def test_attempts_stop_before_overrunning_the_budget(monkeypatch, image) -> None:
+    clock = install_clock(monkeypatch, unit_cost_ms=1e-4)
+    quantizer = AdaptiveQuantizer(budget_ms=BUDGET_MS, palette_size=PALETTE_SIZE)
+    quantizer(image)
+
+    # the machine got 4 times slower since the last frame
+    clock.unit_cost_ms *= 4
+    report = quantizer(image)
+    # each attempt takes 40ms, a third one would overrun the 100ms budget
+    assert report.attempts == 2
+    assert report.budget_used == pytest.approx(0.8)
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from serial import SerialException
+
+from dygma_palette.dygma import keyboard as keyboard_module
+from dygma_palette.dygma.keyboard import DygmaKeyboard
+
+
+class FakeSerial:
+    instances = []
+
+    def __init__(self, replies: list[bytes], **parameters) -> None:
+        self.parameters = parameters
+        self.port = parameters["port"]
+        self.replies = replies
+        self.written = []
+        self.is_open = True
+        FakeSerial.instances.append(self)
+
+    def reset_input_buffer(self) -> None:
+        pass
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def readline(self) -> bytes:
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+@pytest.fixture
+def dygma_keyboard(monkeypatch):
+    replies = []
+    FakeSerial.instances = []
+    monkeypatch.setattr(
+        keyboard_module, "Serial",
+        lambda **parameters: FakeSerial(replies, **parameters))
+    detected_keyboard = SimpleNamespace(
+        serial_port=SimpleNamespace(device="/dev/fake"),
+        hardware_identifier=SimpleNamespace(rgbw_mode=False))
+    with DygmaKeyboard(detected_keyboard) as dygma_keyboard:  # pyright: ignore [reportArgumentType]
+        yield dygma_keyboard, replies
+
+
+def test_open_keeps_an_exclusive_port_with_timeout(dygma_keyboard) -> None:
+    dygma_keyboard, replies = dygma_keyboard
+    replies += [b"chip\r\n", b".\r\n", b"chip\r\n", b".\r\n"]
+    assert dygma_keyboard.neuron_identifier == "chip"
+    assert dygma_keyboard.neuron_identifier == "chip"
+
+    (connection,) = FakeSerial.instances
+    assert connection.parameters["exclusive"]
+    assert connection.parameters["timeout"] is not None
+
+
+@pytest.mark.parametrize("failure", [SerialException("reset"), b"partial"])
+def test_failed_command_reopens_the_port(dygma_keyboard, failure) -> None:
+    dygma_keyboard, replies = dygma_keyboard
+    replies += [b"chip\r\n", failure]
+    with pytest.raises(OSError):
+        dygma_keyboard.neuron_identifier
+    assert not FakeSerial.instances[0].is_open
+
+    replies += [b"chip\r\n", b".\r\n"]
+    assert dygma_keyboard.neuron_identifier == "chip"
+    assert len(FakeSerial.instances) == 2